@@ -4,7 +4,17 @@ import time
 import os
 import sqlite3
 import re
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:  # optional speed-up (see Dockerfile): parsing clusters_with_names.json
+    orjson = None
 
 load_dotenv()
 
@@ -17,61 +27,171 @@ HEADERS = {
     "X-Title": "lol-cluster-country-detector"
 }
 
+# Reused across batches so every call rides the same keep-alive connection
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+_CLUSTER_JSON_RE = re.compile(r'\{\s*"cluster\d+".*?\}', re.DOTALL)
+
+# Fixed instruction block, joined once; only the cluster lines change per batch
+_PROMPT_PREFIX = "\n".join([
+    "ACT AS an expert linguist and League of Legends EUNE region specialist.",
+    "GOAL: Identify the country of origin for player clusters based on their usernames.",
+    "",
+    "RULES:",
+    "1. For each cluster, you MUST provide a country name. 'Unknown', 'Undefined', or 'N/A' is STRICTLY FORBIDDEN.",
+    "2. Use linguistic clues (e.g., 'PL' = Poland, 'RO' = Romania, 'CZ' = Czech Republic, 'GR/EL' = Greece).",
+    "3. If names are generic (English), look for subtle cultural patterns or make your BEST EDUCATED GUESS based on EUNE demographics.",
+    "4. Focus on these countries: Poland, Romania, Greece, Hungary, Czech Republic, Serbia, Bulgaria, Sweden, Norway, Denmark, Finland, Israel, Egypt.",
+    "5. EXCLUDE: Turkey, Russia, and Western Europe (Germany, France, Spain, etc.) as they have separate servers.",
+    "",
+    "OUTPUT FORMAT:",
+    "Return ONLY a raw JSON object. No explanation, no markdown formatting.",
+    'Example: {"cluster1": "Poland", "cluster2": "Romania"}',
+    "",
+    "DATA TO ANALYZE:"
+])
+
+# Uppercase country tags used in Riot IDs ("PL Kowal", "[RO] x", "name#CZ1").
+# Case-sensitive so ordinary words such as "no" or "el" do not count.
+COUNTRY_TAGS = {
+    "PL": "Poland",
+    "RO": "Romania",
+    "GR": "Greece",
+    "EL": "Greece",
+    "CZ": "Czech Republic",
+    "HU": "Hungary",
+    "BG": "Bulgaria",
+    "RS": "Serbia",
+    "SR": "Serbia",
+    "SE": "Sweden",
+    "NO": "Norway",
+    "DK": "Denmark",
+    "FI": "Finland",
+    "IL": "Israel",
+    "EG": "Egypt",
+}
+# Tags that are also everyday words in names ("NO MERCY", "SE VE", "EL DIABLO")
+AMBIGUOUS_COUNTRY_TAGS = {"NO", "SE", "IL", "EL"}
+# A tag only counts where players put tags: the Riot ID tag line ("name#PL1"),
+# brackets ("[RO] x") or, unless it is ambiguous, a leading prefix ("CZ name").
+# Exactly one of the three groups matches.
+_COUNTRY_TAG_RE = re.compile(
+    r"#(" + "|".join(COUNTRY_TAGS) + r")\d*$"
+    r"|\[(" + "|".join(COUNTRY_TAGS) + r")\]"
+    r"|^(" + "|".join(tag for tag in COUNTRY_TAGS if tag not in AMBIGUOUS_COUNTRY_TAGS) + r") "
+)
+TAG_MAJORITY_THRESHOLD = 0.7
+
+DEFAULT_BATCH_SIZE = 25
+MAX_NAMES_PER_CLUSTER = 10
+MAX_CONCURRENT_REQUESTS = 10
+REQUESTS_PER_MINUTE = 60
+MAX_RETRIES = 5
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class RateLimiter:
+    """Token bucket shared by the worker threads, refilled at REQUESTS_PER_MINUTE."""
+
+    def __init__(self, requests_per_minute, burst=1):
+        self.interval = 60.0 / max(requests_per_minute, 1)
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) / self.interval)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) * self.interval
+            time.sleep(wait_time)
+
 def load_clusters_with_names(path):
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with open(path, "rb") as f:
+        raw = f.read()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
     return data["clusters"]
 
 def batch_clusters(clusters, batch_size):
     for i in range(0, len(clusters), batch_size):
         yield clusters[i:i + batch_size]
 
-def build_prompt_for_clusters(cluster_batch):
-    prompt_lines = [
-            "ACT AS an expert linguist and League of Legends EUNE region specialist.",
-            "GOAL: Identify the country of origin for player clusters based on their usernames.",
-            "",
-            "RULES:",
-            "1. For each cluster, you MUST provide a country name. 'Unknown', 'Undefined', or 'N/A' is STRICTLY FORBIDDEN.",
-            "2. Use linguistic clues (e.g., 'PL' = Poland, 'RO' = Romania, 'CZ' = Czech Republic, 'GR/EL' = Greece).",
-            "3. If names are generic (English), look for subtle cultural patterns or make your BEST EDUCATED GUESS based on EUNE demographics.",
-            "4. Focus on these countries: Poland, Romania, Greece, Hungary, Czech Republic, Serbia, Bulgaria, Sweden, Norway, Denmark, Finland, Israel, Egypt.",
-            "5. EXCLUDE: Turkey, Russia, and Western Europe (Germany, France, Spain, etc.) as they have separate servers.",
-            "",
-            "OUTPUT FORMAT:",
-            "Return ONLY a raw JSON object. No explanation, no markdown formatting.",
-            'Example: {"cluster1": "Poland", "cluster2": "Romania"}',
-            "",
-            "DATA TO ANALYZE:"
-        ]
-    
-    for idx, cluster in enumerate(cluster_batch, start=1):
-        cluster_id = f"cluster{idx}"
-        names_str = ", ".join(cluster.get("names", []))
-        prompt_lines.append(f"{cluster_id}: {names_str}")
+def select_cluster_names(cluster, limit=MAX_NAMES_PER_CLUSTER):
+    """Keep the prompt bounded: drop unresolved and repeated names, then cap at `limit`."""
+    selected = []
+    seen = set()
+    for name in cluster.get("names", []):
+        if not name or name == "unknown" or name in seen:
+            continue
+        seen.add(name)
+        selected.append(name)
+        if len(selected) >= limit:
+            break
+    return selected
 
-    return "\n".join(prompt_lines)
+def country_from_tags(cluster):
+    """
+    Return the country when at least TAG_MAJORITY_THRESHOLD of the cluster's
+    names carry a tag for that one country, otherwise None.
+    """
+    names = [name for name in cluster.get("names", []) if name and name != "unknown"]
+    if not names:
+        return None
 
-def call_openrouter_api(prompt):
-    try:
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=HEADERS,
-            json={
-                "model": MODEL,
-                "messages": [{"role": "user", "content": prompt}]
-            },
-            timeout=30
-        )
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        print(f"API call failed: {e}")
+    votes = Counter()
+    for name in names:
+        countries = {COUNTRY_TAGS["".join(groups)] for groups in _COUNTRY_TAG_RE.findall(name.strip())}
+        if len(countries) == 1:
+            votes[countries.pop()] += 1
+    if not votes:
         return None
 
+    country, count = votes.most_common(1)[0]
+    return country if count / len(names) >= TAG_MAJORITY_THRESHOLD else None
+
+def build_prompt_for_clusters(cluster_batch):
+    cluster_lines = "\n".join(
+        f"cluster{idx}: {', '.join(select_cluster_names(cluster))}"
+        for idx, cluster in enumerate(cluster_batch, start=1)
+    )
+    return f"{_PROMPT_PREFIX}\n{cluster_lines}"
+
+def call_openrouter_api(prompt, rate_limiter=None, model=MODEL):
+    for attempt in range(MAX_RETRIES):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            response = SESSION.post(
+                "https://openrouter.ai/api/v1/chat/completions",
+                json={
+                    "model": model,
+                    "messages": [{"role": "user", "content": prompt}]
+                },
+                timeout=30
+            )
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < MAX_RETRIES - 1:
+                retry_after = response.headers.get("Retry-After")
+                wait_time = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+                print(f"API returned HTTP {response.status_code}, retrying in {wait_time:.1f}s")
+                time.sleep(wait_time)
+                continue
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            print(f"API call failed: {e}")
+            return None
+    return None
+
 def parse_ai_response(response_content):
     try:
-        match = re.search(r"\{\s*\"cluster\d+\".*?\}", response_content, re.DOTALL)
+        match = _CLUSTER_JSON_RE.search(response_content)
         if not match:
             print("No valid JSON block found in AI response.")
             return None
@@ -81,10 +201,19 @@ def parse_ai_response(response_content):
         print(f"Failed to parse AI response JSON: {e}")
         return None
 
-def update_countries_in_db(db_path, clusters_batch, cluster_country_map):
+def unexpected_cluster_ids(cluster_batch, cluster_country_map):
+    """Keys in the AI response that name no cluster of this batch."""
+    expected_ids = {f"cluster{idx}" for idx in range(1, len(cluster_batch) + 1)}
+    return sorted(set(cluster_country_map) - expected_ids)
+
+def connect_db(db_path):
     conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def update_countries_in_db(conn, clusters_batch, cluster_country_map):
+    rows = []
     for idx, cluster in enumerate(clusters_batch, start=1):
         cluster_id = f"cluster{idx}"
         country = cluster_country_map.get(cluster_id)
@@ -92,41 +221,97 @@ def update_countries_in_db(db_path, clusters_batch, cluster_country_map):
             print(f"No country found for {cluster_id}, skipping DB update")
             continue
         
-        for puuid in cluster.get("members", []):
-            cursor.execute("UPDATE players SET country = ? WHERE puuid = ?", (country, puuid))
-    
-    conn.commit()
-    conn.close()
+        rows.extend((country, puuid) for puuid in cluster.get("members", []))
+
+    # One transaction per batch instead of one implicit commit per player
+    with conn:
+        conn.executemany("UPDATE players SET country = ? WHERE puuid = ?", rows)
+
+def process_batch(cluster_batch, rate_limiter, model=MODEL):
+    prompt = build_prompt_for_clusters(cluster_batch)
+    print("Sending prompt:\n", prompt)
+
+    response_json = call_openrouter_api(prompt, rate_limiter, model)
+    if response_json is None:
+        print("Skipping this batch due to API error.")
+        return None
+
+    try:
+        ai_content = response_json["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        # OpenRouter can answer 200 with an {"error": ...} body instead of choices
+        print(f"Skipping this batch, unexpected API response: {response_json}")
+        return None
+    return prompt, ai_content
 
 def main():
+    parser = argparse.ArgumentParser(description='Assign countries to player clusters via OpenRouter')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                       help=f'Clusters sent per prompt (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--model', default=MODEL,
+                       help=f'OpenRouter model id (default: {MODEL})')
+    args = parser.parse_args()
+
     clusters = load_clusters_with_names("clusters/clusters_with_names.json")
-    batch_size = 3
-    
-    for cluster_batch in batch_clusters(clusters, batch_size):
-        prompt = build_prompt_for_clusters(cluster_batch)
-        print("Sending prompt:\n", prompt)
-        
-        response_json = call_openrouter_api(prompt)
-        if response_json is None:
-            print("Skipping this batch due to API error.")
-            continue
-        
-        ai_content = response_json["choices"][0]["message"]["content"]
-        
-        # Log AI response for debugging
-        with open("ai_responses.log", "a", encoding="utf-8") as log_file:
-            log_file.write("Prompt:\n" + prompt + "\n")
-            log_file.write("Response:\n" + ai_content + "\n\n")
-        
-        cluster_country_map = parse_ai_response(ai_content)
-        if cluster_country_map is None:
-            print("Skipping this batch due to parsing error.")
-            continue
-        
-        update_countries_in_db(DB_PATH, cluster_batch, cluster_country_map)
-        print(f"Updated DB for batch with {len(cluster_batch)} clusters.")
-        
-        time.sleep(5)  # to avoid rate limits or spamming the API
+    conn = connect_db(DB_PATH)
+
+    # Clusters whose names already agree on a country tag skip the API entirely
+    tagged_clusters = []
+    tagged_country_map = {}
+    ambiguous_clusters = []
+    for cluster in clusters:
+        country = country_from_tags(cluster)
+        if country is None:
+            ambiguous_clusters.append(cluster)
+        else:
+            tagged_clusters.append(cluster)
+            tagged_country_map[f"cluster{len(tagged_clusters)}"] = country
+    if tagged_clusters:
+        update_countries_in_db(conn, tagged_clusters, tagged_country_map)
+        print(f"Assigned {len(tagged_clusters)} clusters from country tags without an API call.")
+
+    batches = list(batch_clusters(ambiguous_clusters, max(args.batch_size, 1)))
+    rate_limiter = RateLimiter(REQUESTS_PER_MINUTE)
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor, \
+            open("ai_responses.log", "a", encoding="utf-8", buffering=1 << 16) as log_file:
+        futures = {
+            executor.submit(process_batch, cluster_batch, rate_limiter, args.model): cluster_batch
+            for cluster_batch in batches
+        }
+
+        # Workers only do network I/O; this thread is the single DB writer
+        try:
+            for future in as_completed(futures):
+                cluster_batch = futures[future]
+                result = future.result()
+                if result is None:
+                    continue
+                prompt, ai_content = result
+
+                # Log AI response for debugging
+                log_file.write(f"Prompt:\n{prompt}\nResponse:\n{ai_content}\n\n")
+
+                cluster_country_map = parse_ai_response(ai_content)
+                if cluster_country_map is None:
+                    print("Skipping this batch due to parsing error.")
+                    continue
+                # A response naming clusters we never sent can't be trusted; missing
+                # clusters are only skipped one by one in update_countries_in_db
+                unexpected_ids = unexpected_cluster_ids(cluster_batch, cluster_country_map)
+                if unexpected_ids:
+                    print(f"Skipping this batch: expected cluster1..cluster{len(cluster_batch)}, got unexpected {unexpected_ids}")
+                    continue
+
+                update_countries_in_db(conn, cluster_batch, cluster_country_map)
+                print(f"Updated DB for batch with {len(cluster_batch)} clusters.")
+        except BaseException:
+            # Don't keep paying for queued API calls whose results can no longer be saved
+            executor.shutdown(cancel_futures=True)
+            raise
+
+    conn.close()
+    SESSION.close()
 
 if __name__ == "__main__":
     main()
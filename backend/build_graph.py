@@ -1,51 +1,109 @@
 import json
+import math
 import os
+import re
 import sqlite3
 import networkx as nx
-from pyvis.network import Network
 import sys
 import argparse
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
 from cluster_persistence import replace_clusters
+from sqlite_chunks import select_in_chunks
+
+try:
+    import orjson
+except ImportError:  # optional speed-up (see Dockerfile) for reading matches and writing page data/clusters.json
+    orjson = None
 
 # === CONFIG ===
 MATCH_FOLDER = os.environ.get("PATHFINDER_MATCH_DIR", "./data")
 DB_PATH = os.environ.get("GRAPH_DB_PATH", "../playersrefined.db")
 OUTPUT_HTML = "output/premade_network.html"
+# Only regular 5v5 games feed the graph; anything else is skipped before pair counting
+MATCH_PARTICIPANTS = 10
+# Above this many nodes the layout is computed here once instead of by the browser's physics,
+# and the page draws it with Sigma.js (WebGL) rather than vis-network's canvas
+PRECOMPUTED_LAYOUT_MIN_NODES = 2000
+LAYOUT_SCALE = 1000
+# Components up to a full premade team are placed on a circle; larger ones get a spring layout
+COMPONENT_CIRCLE_MAX_NODES = 5
+# Node color, size and tooltip prefix for each highlight class
+NODE_STYLE_BOTH = ("#FF4400", 25, " BEST OP & WORST FEED \n")
+NODE_STYLE_BEST_OP = ("#00FF7F", 22, "CLUSTER STAR\n")
+NODE_STYLE_WORST_FEED = ("#FF4444", 22, "CLUSTER FEEDER\n")
+NODE_STYLE_REGULAR = ("#666666", 15, "")
+NODE_FONT = {"color": "white"}
 
 # === Load match data ===
+def load_match_puuids(path):
+    """Return the participant puuids of one match file, or None if it is unusable."""
+    with open(path, 'rb') as file:
+        raw = file.read()
+    try:
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except json.JSONDecodeError:
+        print(f"Failed to load {os.path.basename(path)}")
+        return None
+    try:
+        participants = data["info"]["participants"]
+        if len(participants) != MATCH_PARTICIPANTS:
+            return None
+        # We use puuid here as the node id. Interned so a player seen in many matches
+        # is one string object across the match lists, the graph and the output dicts
+        return [sys.intern(p["puuid"]) for p in participants]
+    except KeyError:
+        return None
+
 def load_matches_from_folder(folder_path):
-    matches = []
-    for filename in os.listdir(folder_path):
-        if filename.startswith("EUN1_") and filename.endswith(".json"):
-            with open(os.path.join(folder_path, filename), 'r', encoding='utf-8') as file:
-                try:
-                    data = json.load(file)
-                    matches.append(data)
-                except json.JSONDecodeError:
-                    print(f"Failed to load {filename}")
-    return matches
+    """
+    Load the participant puuid list of every match in the folder.
+    Only the puuids are kept, and files are read and parsed in parallel.
+    """
+    paths = [
+        os.path.join(folder_path, filename)
+        for filename in os.listdir(folder_path)
+        if filename.startswith("EUN1_") and filename.endswith(".json")
+    ]
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        return [puuids for puuids in executor.map(load_match_puuids, paths) if puuids is not None]
 
 # === Build association graph ===
-def add_match_to_graph(G, match_data):
-    try:
-        # We use puuid here as the node id
-        puuids = [p["puuid"] for p in match_data["info"]["participants"]]
-    except KeyError:
-        return
+def build_graph_from_matches(matches):
+    """
+    Count how often every pair of players shared a match and build the
+    weighted association graph from the totals in one call.
+    """
+    edge_weights = Counter()
+    for puuids in matches:
+        edge_weights.update(combinations(sorted(puuids), 2))
 
-    for i, p1 in enumerate(puuids):
-        for j in range(i + 1, len(puuids)):
-            p2 = puuids[j]
-            if G.has_edge(p1, p2):
-                G[p1][p2]['weight'] += 1
-            else:
-                G.add_edge(p1, p2, weight=1)
+    G = nx.Graph()
+    G.add_weighted_edges_from((u, v, weight) for (u, v), weight in edge_weights.items())
+    return G
 
 # === Get latest name from names string ===
+# A JSON array of strings without escapes or control characters (anything else goes
+# through json.loads); group 1 is the last element
+_PLAIN_NAMES_RE = re.compile(
+    r'\[[ \t\n\r]*(?:"[^"\\\x00-\x1f]*"[ \t\n\r]*,[ \t\n\r]*)*"([^"\\\x00-\x1f]*)"[ \t\n\r]*\][ \t\n\r]*'
+)
+
 def get_latest_name(names_str):
     if not names_str:
         return "Unknown#Unknown"
-    
+
+    # Fast path for the usual '["old", "latest"]' value: when the whole string is a
+    # well-formed array of plain strings, take the last one without building the list
+    match = _PLAIN_NAMES_RE.fullmatch(names_str)
+    if match:
+        latest_name = match.group(1).strip()
+        return latest_name if latest_name else "Unknown#Unknown"
+
+    return parse_latest_name(names_str)
+
+def parse_latest_name(names_str):
     try:
         # Parse the JSON string to get the list of names
         names_list = json.loads(names_str)
@@ -62,58 +120,151 @@ def get_latest_name(names_str):
         return "Unknown#Unknown"
 
 # === Enrich nodes with player stats ===
-def add_player_stats_to_graph(G, db_path):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+_db_connections = {}
 
-    for node in G.nodes():
-        cursor.execute("SELECT names, feedscore, opscore, country FROM players WHERE puuid = ?", (node,))
-        row = cursor.fetchone()
-        if row:
-            latest_name = get_latest_name(row[0])
-            feedscore = row[1]
-            opscore = row[2]
-            country = row[3]
-            G.nodes[node]["label_name"] = latest_name
-            G.nodes[node]["feedscore"] = feedscore
-            G.nodes[node]["opscore"] = opscore
-            G.nodes[node]["country"] = country
-        else:
-            G.nodes[node]["label_name"] = "Unknown#Unknown"
-            G.nodes[node]["feedscore"] = "N/A"
-            G.nodes[node]["opscore"] = "N/A"
-            G.nodes[node]["country"] = "N/A"
+def get_db_connection(db_path):
+    """
+    Shared read-only connection per database file, opened and tuned once.
+    The journal mode is left alone since the cluster writer and other
+    services share this database.
+    """
+    conn = _db_connections.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(db_path)
+        conn.executescript(
+            """
+            PRAGMA query_only=1;
+            PRAGMA cache_size=-65536;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+            """
+        )
+        _db_connections[db_path] = conn
+    return conn
+
+def fetch_player_rows(cursor, puuids):
+    query = "SELECT puuid, names, feedscore, opscore, country FROM players WHERE puuid IN ({placeholders})"
+    return {row[0]: row for row in select_in_chunks(cursor, query, puuids)}
+
+def parse_score(value):
+    """Numeric form of a stored score, or NaN when it is not a number."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+MISSING_PLAYER_ATTRS = {
+    "label_name": "Unknown#Unknown",
+    # None rather than NaN so build_score_columns can rank missing players as 0
+    "feedscore": None,
+    "opscore": None,
+    "country": "N/A",
+}
 
-    conn.close()
+def add_player_stats_to_graph(G, db_path):
+    cursor = get_db_connection(db_path).cursor()
+    player_rows = fetch_player_rows(cursor, list(G.nodes()))
+    cursor.close()
+
+    player_data = {}
+    for puuid, names, feedscore, opscore, country in player_rows.values():
+        feedscore = parse_score(feedscore)
+        opscore = parse_score(opscore)
+        player_data[puuid] = {
+            "label_name": get_latest_name(names),
+            "feedscore": feedscore,
+            "opscore": opscore,
+            "country": country,
+        }
+    for node in G.nodes():
+        player_data.setdefault(node, MISSING_PLAYER_ATTRS)
+    nx.set_node_attributes(G, player_data)
 
 # === Filter standalone nodes ===
+def build_adjacency(edges, nodes=()):
+    """Plain dict-of-sets adjacency; `nodes` are included even without edges."""
+    adjacency = defaultdict(set)
+    for node in nodes:
+        adjacency[node]
+    for u, v in edges:
+        adjacency[u].add(v)
+        adjacency[v].add(u)
+    return adjacency
+
+def connected_components(adjacency):
+    """Iterative DFS over a dict-of-sets adjacency, yielding one node set per component."""
+    seen = set()
+    for start in adjacency:
+        if start in seen:
+            continue
+        seen.add(start)
+        component = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for neighbor in adjacency[node]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    component.add(neighbor)
+                    stack.append(neighbor)
+        yield component
+
+def prepare_filtered_graph(G, min_edge_weight=3):
+    """
+    Single pass over the edges of G that yields both the subgraph of nodes
+    with at least one edge of weight >= min_edge_weight and the connected
+    components formed by those edges. visualize_graph runs it once and hands
+    the result to the clustering, layout and statistics steps.
+    """
+    strong_edges = [(u, v) for u, v, d in G.edges(data=True) if d.get('weight', 1) >= min_edge_weight]
+    adjacency = build_adjacency(strong_edges)
+    components = list(connected_components(adjacency))
+    G_filtered = G.edge_subgraph(strong_edges).copy()
+    return G_filtered, components
+
 def filter_connected_nodes(G, min_edge_weight=3):
     """
     Create a subgraph containing only nodes that have at least one edge
     with weight >= min_edge_weight
     """
-    connected_nodes = set()
-    
-    for source, target, data in G.edges(data=True):
-        weight = data.get("weight", 1)
-        if weight >= min_edge_weight:
-            connected_nodes.add(source)
-            connected_nodes.add(target)
-    
-    return G.subgraph(connected_nodes).copy()
+    G_filtered, _components = prepare_filtered_graph(G, min_edge_weight)
+    return G_filtered
 
 # === Identify clusters and highlight special nodes ===
-def identify_clusters_and_highlights(G, min_edge_weight=3):
+def build_score_columns(G):
     """
-    Identify connected components (clusters) and find the best/worst players in each.
-    For large clusters, break them into smaller sub-groups based on edge weights.
+    Column layout of the ranking scores: a node -> row index map plus parallel
+    opscore/feedscore lists. Players missing from the DB rank as 0 and
+    unusable scores as -inf.
+    """
+    def ranking_score(score):
+        if score is None:
+            return 0.0
+        return float('-inf') if math.isnan(score) else score
+
+    node_index = {}
+    opscores = []
+    feedscores = []
+    for i, (node, data) in enumerate(G.nodes(data=True)):
+        node_index[node] = i
+        opscores.append(ranking_score(data.get('opscore')))
+        feedscores.append(ranking_score(data.get('feedscore')))
+    return node_index, opscores, feedscores
+
+def highest_scoring_row(rows, scores):
+    """First row with the highest score, or None if no row has a usable score."""
+    best_row = max(rows, key=scores.__getitem__)
+    return None if scores[best_row] == float('-inf') else best_row
+
+def identify_clusters_and_highlights(G, base_clusters, min_edge_weight=3):
+    """
+    Find the best/worst players in each connected component (cluster) of the
+    strong edges, as computed by prepare_filtered_graph. For large clusters,
+    break them into smaller sub-groups based on edge weights.
     Save all cluster and highlight info to clusters/clusters.json.
     """
-    filtered_edges = [(u, v, d) for u, v, d in G.edges(data=True) if d.get('weight', 1) >= min_edge_weight]
-    cluster_graph = nx.Graph()
-    cluster_graph.add_edges_from(filtered_edges)
-    
-    base_clusters = list(nx.connected_components(cluster_graph))
+    node_index, opscores, feedscores = build_score_columns(G)
+    nodes_by_row = list(node_index)
     
     highlights = {
         'best_op': set(),
@@ -136,28 +287,11 @@ def identify_clusters_and_highlights(G, min_edge_weight=3):
             if len(sub_cluster) < 2:
                 continue
 
-            best_op_node = None
-            worst_feed_node = None
-            best_op_score = float('-inf')
-            worst_feed_score = float('-inf')
-            
-            for node in sub_cluster:
-                node_data = G.nodes[node]
-                try:
-                    opscore = float(node_data.get('opscore', 0)) if node_data.get('opscore') != 'N/A' else 0
-                    if opscore > best_op_score:
-                        best_op_score = opscore
-                        best_op_node = node
-                except (ValueError, TypeError):
-                    pass
-
-                try:
-                    feedscore = float(node_data.get('feedscore', 0)) if node_data.get('feedscore') != 'N/A' else 0
-                    if feedscore > worst_feed_score:
-                        worst_feed_score = feedscore
-                        worst_feed_node = node
-                except (ValueError, TypeError):
-                    pass
+            rows = [node_index[node] for node in sub_cluster]
+            best_op_row = highest_scoring_row(rows, opscores)
+            worst_feed_row = highest_scoring_row(rows, feedscores)
+            best_op_node = nodes_by_row[best_op_row] if best_op_row is not None else None
+            worst_feed_node = nodes_by_row[worst_feed_row] if worst_feed_row is not None else None
             
             if best_op_node:
                 highlights['best_op'].add(best_op_node)
@@ -180,9 +314,13 @@ def identify_clusters_and_highlights(G, min_edge_weight=3):
 
     os.makedirs('clusters', exist_ok=True)
 
-    # Save to JSON
-    with open('clusters/clusters.json', 'w', encoding='utf-8') as f:
-        json.dump(result_json, f, indent=2)
+    # Save to JSON (compact: the file is machine-consumed by fetch_clusters.py)
+    if orjson is not None:
+        with open('clusters/clusters.json', 'wb') as f:
+            f.write(orjson.dumps(result_json))
+    else:
+        with open('clusters/clusters.json', 'w', encoding='utf-8') as f:
+            json.dump(result_json, f, separators=(',', ':'))
 
     persisted_clusters = []
     for index, cluster in enumerate(cluster_data, start=1):
@@ -209,20 +347,17 @@ def break_into_subgroups(G, large_cluster, min_edge_weight):
     """
     Break a large cluster into smaller sub-groups based on connection strength
     """
-    # Create subgraph of just this cluster
-    cluster_subgraph = G.subgraph(large_cluster).copy()
-    
-    # Find high-weight edges (frequent teammates)
-    high_weight_edges = []
-    for u, v, data in cluster_subgraph.edges(data=True):
-        weight = data.get('weight', 1)
-        if weight >= min_edge_weight + 2:  # Higher threshold for sub-grouping
-            high_weight_edges.append((u, v))
-    subgroup_graph = nx.Graph()
-    subgroup_graph.add_nodes_from(large_cluster)
-    subgroup_graph.add_edges_from(high_weight_edges)
+    # Find high-weight edges (frequent teammates) inside this cluster
+    adjacency = build_adjacency(
+        (
+            (u, v)
+            for u, v, data in G.subgraph(large_cluster).edges(data=True)
+            if data.get('weight', 1) >= min_edge_weight + 2  # Higher threshold for sub-grouping
+        ),
+        nodes=large_cluster,
+    )
     
-    sub_clusters = list(nx.connected_components(subgroup_graph))
+    sub_clusters = list(connected_components(adjacency))
     
     valid_sub_clusters = [sc for sc in sub_clusters if len(sc) >= 3]
     
@@ -244,6 +379,65 @@ def break_into_subgroups(G, large_cluster, min_edge_weight):
     return final_sub_clusters
 
 # === Visualize graph ===
+def compute_layout(G, G_filtered, components):
+    """
+    Layout computed once in Python so large graphs render without running
+    force-directed stabilization in the browser. Each component of the drawn
+    edges (weight >= min_edge_weight) is laid out on its own, so the cost
+    follows the component sizes instead of growing with n^2 over the whole
+    graph, and the components are then packed in rows; nodes without a drawn
+    edge fill the remaining cells of the grid. Returns None when NumPy/SciPy
+    are not installed and the browser physics has to do it.
+    """
+    connected = set(G_filtered)
+    cells = sorted(components, key=len, reverse=True)
+    cells.extend({node} for node in G if node not in connected)
+
+    # Shelf packing: every cell gets a square of side ~sqrt(size) units
+    row_width = math.sqrt(sum(len(cell) for cell in cells)) * 2
+    positions = {}
+    x = y = row_height = 0.0
+    try:
+        for cell in cells:
+            if len(cell) > COMPONENT_CIRCLE_MAX_NODES:
+                cell_layout = nx.spring_layout(G_filtered.subgraph(cell), iterations=50, seed=0)
+            elif len(cell) > 1:
+                cell_layout = nx.circular_layout(sorted(cell))
+            else:
+                cell_layout = {node: (0.0, 0.0) for node in cell}
+            side = 2 * math.sqrt(len(cell))
+            if x > 0 and x + side > row_width:
+                x, y, row_height = 0.0, y + row_height, 0.0
+            radius = side / 2 - 0.5 if len(cell) > 1 else 0.0
+            for node, (px, py) in cell_layout.items():
+                positions[node] = (x + side / 2 + px * radius, y + side / 2 + py * radius)
+            x += side
+            row_height = max(row_height, side)
+    except ImportError as e:
+        print(f"Precomputed layout unavailable ({e}); falling back to browser physics")
+        return None
+
+    # Center and rescale to [-1, 1] like nx.spring_layout, which LAYOUT_SCALE expects
+    half_width, half_height = row_width / 2, (y + row_height) / 2
+    extent = max(half_width, half_height, 1.0)
+    return {node: ((px - half_width) / extent, (py - half_height) / extent) for node, (px, py) in positions.items()}
+
+def write_graph_data(path, nodes_data, edges_data):
+    """
+    Write node/edge dicts as a script defining GRAPH_NODES and GRAPH_EDGES.
+    """
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(b"var GRAPH_NODES = " + orjson.dumps(nodes_data))
+            f.write(b";\nvar GRAPH_EDGES = " + orjson.dumps(edges_data) + b";\n")
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("var GRAPH_NODES = ")
+            json.dump(nodes_data, f)
+            f.write(";\nvar GRAPH_EDGES = ")
+            json.dump(edges_data, f)
+            f.write(";\n")
+
 def visualize_graph(G, output_html="premade_network.html", show_standalone=True, min_edge_weight=3):
     """
     Visualize the graph with option to hide standalone nodes
@@ -253,46 +447,34 @@ def visualize_graph(G, output_html="premade_network.html", show_standalone=True,
         output_html: Output file path
         show_standalone: If False, only show nodes with connections >= min_edge_weight
         min_edge_weight: Minimum edge weight to display
+
+    Returns:
+        The graph that was drawn (the filtered graph when show_standalone is False),
+        the filtered graph and its connected components
     """
+    # One filtering pass for the clustering, the layout and the caller's statistics;
+    # the filtered graph has the same strong edges, so its components are the same
+    G_filtered, components = prepare_filtered_graph(G, min_edge_weight)
     if not show_standalone:
-        G_viz = filter_connected_nodes(G, min_edge_weight)
+        G_viz = G_filtered
         print(f"Filtered graph: {len(G_viz.nodes())} connected nodes (from {len(G.nodes())} total)")
     else:
         G_viz = G
         print(f"Full graph: {len(G_viz.nodes())} nodes")
-    highlights = identify_clusters_and_highlights(G_viz, min_edge_weight)
+    highlights = identify_clusters_and_highlights(G_viz, components, min_edge_weight)
     print(f"Highlighted nodes - Best OP: {len(highlights['best_op'])}, Worst Feed: {len(highlights['worst_feed'])}")
     
-    net = Network(notebook=False, height="800px", width="100%", bgcolor="#222222", font_color="white")
-    net.set_options("""
-    var options = {
-        "physics": {
-            "enabled": true,
-            "stabilization": {
-                "enabled": true,
-                "iterations": 300,
-                "updateInterval": 25
-            },
-            "barnesHut": {
-                "gravitationalConstant": -12000,
-                "centralGravity": 0.8,
-                "springLength": 150,
-                "springConstant": 0.02,
-                "damping": 0.09,
-                "avoidOverlap": 0.2
-            }
-        },
-        "interaction": {
-            "dragNodes": true,
-            "dragView": true,
-            "zoomView": true
-        }
-    }
-    """)
+    positions = compute_layout(G_viz, G_filtered, components) if len(G_viz) >= PRECOMPUTED_LAYOUT_MIN_NODES else None
+
     def format_score(score):
-        return f"{score:.2f}" if isinstance(score, (int, float)) else "N/A"
+        return "N/A" if score is None or math.isnan(score) else f"{score:.2f}"
+
+    best_op = highlights['best_op']
+    worst_feed = highlights['worst_feed']
 
-    # Add nodes with special coloring for highlights
+    # vis-network node/edge dicts in the shape pyvis used to produce; building them
+    # directly skips pyvis' linear duplicate checks on every add
+    nodes_data = []
     for node, data in G_viz.nodes(data=True):
 
         feedscore = format_score(data.get('feedscore'))
@@ -301,31 +483,31 @@ def visualize_graph(G, output_html="premade_network.html", show_standalone=True,
         label = f"{data.get('label_name', 'Unknown#Unknown')}\nFeedscore:{feedscore}\nOpscore:{opscore}\nCountry:{data.get('country','N/A')}"
                 
         # Determine node color and size based on highlights
-        if node in highlights['best_op'] and node in highlights['worst_feed']:
-            color = "#FF4400"  
-            size = 25
-            title = f" BEST OP & WORST FEED \n{label}"
-        elif node in highlights['best_op']:
-            color = "#00FF7F"  
-            size = 22
-            title = f"CLUSTER STAR\n{label}"
-        elif node in highlights['worst_feed']:
-            color = "#FF4444"
-            size = 22
-            title = f"CLUSTER FEEDER\n{label}"
+        if node in best_op:
+            style = NODE_STYLE_BOTH if node in worst_feed else NODE_STYLE_BEST_OP
+        elif node in worst_feed:
+            style = NODE_STYLE_WORST_FEED
         else:
-            color = "#666666"
-            size = 15
-            title = label
-        
-        net.add_node(node, label=label, title=title, color=color, size=size)
-
-    edges_added = 0
-    for source, target, data in G_viz.edges(data=True):
-        weight = data.get("weight", 1)
-        if weight >= min_edge_weight:
-            net.add_edge(source, target, value=weight, title=f"Matches: {weight}")
-            edges_added += 1
+            style = NODE_STYLE_REGULAR
+
+        # No "title": the page builds tooltips on hover from the label and color
+        node_data = {"color": style[0], "size": style[1]}
+        if positions is not None:
+            x, y = positions[node]
+            node_data.update(x=float(x) * LAYOUT_SCALE, y=float(y) * LAYOUT_SCALE, physics=False)
+        node_data.update(id=node, label=label, shape="dot", font=NODE_FONT)
+        nodes_data.append(node_data)
+
+    # Walk the adjacency dicts directly; each undirected edge is seen from both ends,
+    # so keep only the source < target direction
+    edges_data = []
+    for source, neighbors in G_viz.adj.items():
+        for target, data in neighbors.items():
+            if source < target:
+                weight = data.get("weight", 1)
+                if weight >= min_edge_weight:
+                    edges_data.append({"value": weight, "from": source, "to": target})
+    edges_added = len(edges_data)
     
     print(f"Added {edges_added} edges with weight >= {min_edge_weight}")
     
@@ -333,7 +515,8 @@ def visualize_graph(G, output_html="premade_network.html", show_standalone=True,
     <html>
     <head>
         <meta charset="utf-8">
-        <script type="text/javascript" src="https://unpkg.com/vis-network/standalone/vis-network.min.js"></script>
+        RENDERER_LIBS
+        <script type="text/javascript" src="GRAPH_DATA_SRC"></script>
         <style type="text/css">
             #mynetworkid {
                 width: 100%;
@@ -386,9 +569,22 @@ def visualize_graph(G, output_html="premade_network.html", show_standalone=True,
         <div id="mynetworkid"></div>
         
         <script type="text/javascript">
-            // This will be replaced with actual data
-            var nodes = new vis.DataSet(NODES_DATA);
-            var edges = new vis.DataSet(EDGES_DATA);
+            // Tooltips are built on hover; the prefix marks the node's highlight class
+            var TITLE_PREFIXES = TITLE_PREFIXES_JSON;
+            function nodeTitle(color, label) {
+                return (TITLE_PREFIXES[color] || '') + label;
+            }
+RENDERER_SCRIPT
+        </script>
+    </body>
+    </html>
+    """
+    
+    vis_libs = '<script type="text/javascript" src="https://unpkg.com/vis-network/standalone/vis-network.min.js"></script>'
+    vis_script = """
+            // GRAPH_NODES / GRAPH_EDGES come from the data script next to this page
+            var nodes = new vis.DataSet(GRAPH_NODES);
+            var edges = new vis.DataSet(GRAPH_EDGES);
             var allNodes = nodes.get();
             var allEdges = edges.get();
             var currentMinWeight = 3;
@@ -416,7 +612,8 @@ def visualize_graph(G, output_html="premade_network.html", show_standalone=True,
                 interaction: {
                     dragNodes: true,
                     dragView: true,
-                    zoomView: true
+                    zoomView: true,
+                    hover: true
                 },
                 nodes: {
                     borderWidth: 2,
@@ -427,16 +624,30 @@ def visualize_graph(G, output_html="premade_network.html", show_standalone=True,
                     font: { color: '#eeeeee', size: 12 },
                     chosen: {
                         node: function(values, id, selected, hovering) {
-                            values.size *= 1.2;
+                            // hover is only on for the tooltips, so keep growing selected nodes only
+                            if (selected) values.size *= 1.2;
                         }
                     }
                 },
                 edges: {
                     color: 'lightgray',
-                    width: 1
+                    width: 1,
+                    hoverWidth: 0
                 }
             };
             var network = new vis.Network(container, data, options);
+            network.on('hoverNode', function(params) {
+                var node = nodes.get(params.node);
+                if (node.title === undefined) {
+                    nodes.update({ id: node.id, title: nodeTitle(node.color, node.label) });
+                }
+            });
+            network.on('hoverEdge', function(params) {
+                var edge = edges.get(params.edge);
+                if (edge.title === undefined) {
+                    edges.update({ id: edge.id, title: 'Matches: ' + edge.value });
+                }
+            });
             
             function toggleMode(mode) {
                 currentMode = mode;
@@ -479,32 +690,142 @@ def visualize_graph(G, output_html="premade_network.html", show_standalone=True,
                 nodes.add(nodesToShow);
                 edges.add(filteredEdges);
             }
-        </script>
-    </body>
-    </html>
-    """
-    
-    net.write_html(output_html, notebook=False)
-    
-    with open(output_html, 'r', encoding='utf-8') as f:
-        html_content = f.read()
-    
-    import re
-    nodes_match = re.search(r'var nodes = new vis\.DataSet\((.*?)\);', html_content, re.DOTALL)
-    edges_match = re.search(r'var edges = new vis\.DataSet\((.*?)\);', html_content, re.DOTALL)
-    options_match = re.search(r'var options = ({.*?});', html_content, re.DOTALL)
-    
-    if nodes_match and edges_match and options_match:
-        nodes_data = nodes_match.group(1)
-        edges_data = edges_match.group(1)
-        options_data = options_match.group(1)
-        
-        final_html = html_template.replace('NODES_DATA', nodes_data)
-        final_html = final_html.replace('EDGES_DATA', edges_data)
-        final_html = final_html.replace('OPTIONS_DATA', options_data)
-        
-        with open(output_html, 'w', encoding='utf-8') as f:
-            f.write(final_html)
+"""
+
+    sigma_libs = (
+        '<script type="text/javascript" src="https://unpkg.com/graphology@0.25.4/dist/graphology.umd.min.js"></script>\n'
+        '        <script type="text/javascript" src="https://unpkg.com/sigma@2.4.0/build/sigma.min.js"></script>'
+    )
+    sigma_script = """
+            // Large graph: positions are precomputed, so Sigma draws it with WebGL.
+            // GRAPH_NODES / GRAPH_EDGES start out as the coarse (highlights only) view.
+            var currentMinWeight = 3;
+            var currentMode = 'all';
+            
+            var graph = new graphology.Graph();
+            function addGraphData(nodes, edges) {
+                nodes.forEach(function(node) {
+                    if (graph.hasNode(node.id)) return;
+                    graph.addNode(node.id, {
+                        x: node.x,
+                        y: -node.y,
+                        size: node.size / 3,
+                        color: node.color,
+                        label: node.label.split('\\n')[0],
+                        details: node.label
+                    });
+                });
+                edges.forEach(function(edge) {
+                    if (graph.hasEdge(edge.from, edge.to)) return;
+                    graph.addEdge(edge.from, edge.to, {
+                        size: Math.max(1, Math.log2(edge.value)),
+                        color: 'lightgray',
+                        value: edge.value
+                    });
+                });
+            }
+            addGraphData(GRAPH_NODES, GRAPH_EDGES);
+            
+            var container = document.getElementById('mynetworkid');
+            var renderer = new Sigma(graph, container, {
+                labelColor: { color: '#eeeeee' },
+                labelRenderedSizeThreshold: 8
+            });
+            
+            // Fetch the full graph the first time the user zooms in past half the initial view
+            var fullLoaded = false;
+            renderer.getCamera().on('updated', function(state) {
+                if (fullLoaded || state.ratio > 0.5) return;
+                fullLoaded = true;
+                var script = document.createElement('script');
+                script.src = 'GRAPH_FULL_SRC';
+                script.onload = function() {
+                    addGraphData(GRAPH_NODES, GRAPH_EDGES);
+                    updateVisualization();
+                };
+                document.head.appendChild(script);
+            });
+            
+            var tooltip = document.createElement('div');
+            tooltip.style.cssText = 'position: absolute; bottom: 10px; left: 10px; z-index: 1000; display: none; ' +
+                'white-space: pre-line; background: rgba(0,0,0,0.8); color: white; padding: 10px; border-radius: 5px;';
+            container.appendChild(tooltip);
+            renderer.on('enterNode', function(event) {
+                tooltip.textContent = nodeTitle(graph.getNodeAttribute(event.node, 'color'),
+                                                graph.getNodeAttribute(event.node, 'details'));
+                tooltip.style.display = 'block';
+            });
+            renderer.on('leaveNode', function() {
+                tooltip.style.display = 'none';
+            });
+            
+            function toggleMode(mode) {
+                currentMode = mode;
+                updateVisualization();
+                
+                // Update button states
+                document.getElementById('showAll').classList.toggle('active', mode === 'all');
+                document.getElementById('showConnected').classList.toggle('active', mode === 'connected');
+            }
+            
+            function updateMinWeight() {
+                currentMinWeight = parseInt(document.getElementById('minWeight').value);
+                updateVisualization();
+            }
+            
+            function updateVisualization() {
+                // Hide edges below the weight, and in connected mode the nodes left without one
+                var connectedNodeIds = new Set();
+                graph.forEachEdge(function(edge, attributes, source, target) {
+                    var visible = attributes.value >= currentMinWeight;
+                    graph.setEdgeAttribute(edge, 'hidden', !visible);
+                    if (visible) {
+                        connectedNodeIds.add(source);
+                        connectedNodeIds.add(target);
+                    }
+                });
+                graph.forEachNode(function(node) {
+                    graph.setNodeAttribute(node, 'hidden', currentMode === 'connected' && !connectedNodeIds.has(node));
+                });
+            }
+"""
+
+    if positions is not None:
+        # Past a few thousand nodes vis-network's canvas renderer stops being interactive;
+        # the layout is already fixed here, so hand those graphs to Sigma's WebGL renderer
+        renderer_libs, renderer_script = sigma_libs, sigma_script
+    else:
+        renderer_libs, renderer_script = vis_libs, vis_script
+
+    final_html = html_template.replace('RENDERER_LIBS', renderer_libs)
+    final_html = final_html.replace('RENDERER_SCRIPT', renderer_script.strip('\n'))
+    title_prefixes = {color: prefix for color, _size, prefix in
+                      (NODE_STYLE_BOTH, NODE_STYLE_BEST_OP, NODE_STYLE_WORST_FEED)}
+    final_html = final_html.replace('TITLE_PREFIXES_JSON', json.dumps(title_prefixes))
+
+    # The node/edge data goes to its own script file so the page stays small and the
+    # browser can cache the data separately (works from file:// too)
+    data_js = os.path.splitext(output_html)[0] + "_data.js"
+    write_graph_data(data_js, nodes_data, edges_data)
+    if positions is not None:
+        # Level of detail: the page starts from the cluster highlights (each cluster's
+        # best OP player and feeder) and only pulls in the full data once zoomed in
+        coarse_js = os.path.splitext(output_html)[0] + "_coarse.js"
+        coarse_ids = best_op | worst_feed
+        coarse_nodes = [node_data for node_data in nodes_data if node_data["id"] in coarse_ids]
+        coarse_edges = [edge_data for edge_data in edges_data
+                        if edge_data["from"] in coarse_ids and edge_data["to"] in coarse_ids]
+        write_graph_data(coarse_js, coarse_nodes, coarse_edges)
+        print(f"Coarse view: {len(coarse_nodes)} nodes, {len(coarse_edges)} edges")
+        final_html = final_html.replace('GRAPH_DATA_SRC', os.path.basename(coarse_js))
+        final_html = final_html.replace('GRAPH_FULL_SRC', os.path.basename(data_js))
+    else:
+        final_html = final_html.replace('GRAPH_DATA_SRC', os.path.basename(data_js))
+
+    with open(output_html, 'w', encoding='utf-8') as f:
+        f.write(final_html)
+
+    return G_viz, G_filtered, components
 
 # === Main ===
 if __name__ == "__main__":
@@ -516,20 +837,17 @@ if __name__ == "__main__":
     
     args = parser.parse_args()
     
-    G = nx.Graph()
-
     print("Loading matches...")
     matches = load_matches_from_folder(MATCH_FOLDER)
 
     print("Building graph...")
-    for match in matches:
-        add_match_to_graph(G, match)
+    G = build_graph_from_matches(matches)
 
     print("Adding player stats...")
     add_player_stats_to_graph(G, DB_PATH)
 
     print("Generating visualization...")
-    visualize_graph(G, OUTPUT_HTML, 
+    _G_viz, G_filtered, _components = visualize_graph(G, OUTPUT_HTML, 
                    show_standalone=not args.connected_only, 
                    min_edge_weight=args.min_weight)
 
@@ -537,7 +855,8 @@ if __name__ == "__main__":
     
     # Print some statistics
     total_nodes = len(G.nodes())
-    connected_nodes = len(filter_connected_nodes(G, args.min_weight).nodes())
+    # Reuse the filtered graph the visualization step already built
+    connected_nodes = G_filtered.number_of_nodes()
     standalone_nodes = total_nodes - connected_nodes
     
     print(f"\nGraph Statistics:")
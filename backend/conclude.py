@@ -1,7 +1,7 @@
 import sqlite3
 import json
 import os
-from statistics import mean
+import heapq
 from collections import defaultdict
 from dotenv import load_dotenv
 
@@ -20,40 +20,37 @@ def analyze_country_performance(db_path):
     SELECT puuid, names, feedscore, opscore, country, match_count 
     FROM players 
     WHERE country IS NOT NULL AND country != ''
+      AND feedscore IS NOT NULL AND opscore IS NOT NULL
     """
     
     cursor.execute(query)
-    rows = cursor.fetchall()
-    conn.close()
-    country_data = defaultdict(list)
+    # Group once, keeping per-country score columns alongside the player rows
+    country_data = defaultdict(lambda: {'players': [], 'feedscores': [], 'opscores': [], 'total_matches': 0})
     
-    for row in rows:
-        puuid, names, feedscore, opscore, country, match_count = row
-        if feedscore is None or opscore is None:
-            continue
-            
-        country_data[country].append({
+    # Stream rows off the cursor instead of materialising the whole result first
+    for puuid, names, feedscore, opscore, country, match_count in cursor:
+        group = country_data[country]
+        group['players'].append({
             'puuid': puuid,
             'names': names,
             'feedscore': feedscore,
             'opscore': opscore,
             'match_count': match_count
         })
+        group['feedscores'].append(feedscore)
+        group['opscores'].append(opscore)
+        if match_count:
+            group['total_matches'] += match_count
+    conn.close()
     country_stats = {}
     
-    for country, players in country_data.items():
-        if not players:
-            continue
-            
-        feedscores = [p['feedscore'] for p in players]
-        opscores = [p['opscore'] for p in players]
-        
+    for country, group in country_data.items():
         country_stats[country] = {
-            'player_count': len(players),
-            'avg_feedscore': mean(feedscores),
-            'avg_opscore': mean(opscores),
-            'total_matches': sum(p['match_count'] for p in players if p['match_count']),
-            'players': players
+            'player_count': len(group['players']),
+            'avg_feedscore': sum(group['feedscores']) / len(group['feedscores']),
+            'avg_opscore': sum(group['opscores']) / len(group['opscores']),
+            'total_matches': group['total_matches'],
+            'players': group['players']
         }
     
     return country_stats
@@ -64,15 +61,14 @@ def display_results(country_stats):
     print("=" * 80)
     print("COUNTRY PERFORMANCE ANALYSIS")
     print("=" * 80)
-    sorted_by_opscore = sorted(
-        country_stats.items(), 
-        key=lambda x: x[1]['avg_opscore'], 
-        reverse=True
-    )
-    sorted_by_feedscore = sorted(
-        country_stats.items(), 
-        key=lambda x: x[1]['avg_feedscore']
-    )
+    # Pull the averages out once so the heaps compare plain floats. Only the ten best and
+    # worst of each ranking are shown; the worst lists walk the rows backwards so ties
+    # come out in the same order a full sort would give them.
+    rows = [(stats['avg_opscore'], stats['avg_feedscore'], country, stats) for country, stats in country_stats.items()]
+    best_by_opscore = [(country, stats) for _, _, country, stats in heapq.nlargest(10, rows, key=lambda r: r[0])]
+    best_by_feedscore = [(country, stats) for _, _, country, stats in heapq.nsmallest(10, rows, key=lambda r: r[1])]
+    worst_by_opscore = [(country, stats) for _, _, country, stats in heapq.nsmallest(10, reversed(rows), key=lambda r: r[0])]
+    worst_by_feedscore = [(country, stats) for _, _, country, stats in heapq.nlargest(10, reversed(rows), key=lambda r: r[1])]
     
     print(f"\n📊 SUMMARY STATISTICS")
     print(f"Total countries analyzed: {len(country_stats)}")
@@ -84,7 +80,7 @@ def display_results(country_stats):
     print(f"{'Rank':<4} {'Country':<20} {'Players':<8} {'Avg OpScore':<12} {'Avg FeedScore':<13} {'Total Matches'}")
     print("-" * 80)
     
-    for i, (country, stats) in enumerate(sorted_by_opscore[:10], 1):
+    for i, (country, stats) in enumerate(best_by_opscore, 1):
         print(f"{i:<4} {country:<20} {stats['player_count']:<8} "
               f"{stats['avg_opscore']:<12.2f} {stats['avg_feedscore']:<13.2f} {stats['total_matches']}")
     
@@ -93,7 +89,7 @@ def display_results(country_stats):
     print(f"{'Rank':<4} {'Country':<20} {'Players':<8} {'Avg FeedScore':<13} {'Avg OpScore':<12} {'Total Matches'}")
     print("-" * 80)
     
-    for i, (country, stats) in enumerate(sorted_by_feedscore[:10], 1):
+    for i, (country, stats) in enumerate(best_by_feedscore, 1):
         print(f"{i:<4} {country:<20} {stats['player_count']:<8} "
               f"{stats['avg_feedscore']:<13.2f} {stats['avg_opscore']:<12.2f} {stats['total_matches']}")
     
@@ -102,7 +98,7 @@ def display_results(country_stats):
     print(f"{'Rank':<4} {'Country':<20} {'Players':<8} {'Avg OpScore':<12} {'Avg FeedScore':<13} {'Total Matches'}")
     print("-" * 80)
     
-    for i, (country, stats) in enumerate(reversed(sorted_by_opscore[-10:]), 1):
+    for i, (country, stats) in enumerate(worst_by_opscore, 1):
         print(f"{i:<4} {country:<20} {stats['player_count']:<8} "
               f"{stats['avg_opscore']:<12.2f} {stats['avg_feedscore']:<13.2f} {stats['total_matches']}")
     
@@ -111,7 +107,7 @@ def display_results(country_stats):
     print(f"{'Rank':<4} {'Country':<20} {'Players':<8} {'Avg FeedScore':<13} {'Avg OpScore':<12} {'Total Matches'}")
     print("-" * 80)
     
-    for i, (country, stats) in enumerate(reversed(sorted_by_feedscore[-10:]), 1):
+    for i, (country, stats) in enumerate(worst_by_feedscore, 1):
         print(f"{i:<4} {country:<20} {stats['player_count']:<8} "
               f"{stats['avg_feedscore']:<13.2f} {stats['avg_opscore']:<12.2f} {stats['total_matches']}")
 
@@ -135,7 +131,10 @@ def show_country_details(country_stats, country_name):
     sorted_players = sorted(stats['players'], key=lambda x: x['opscore'], reverse=True)
     
     for i, player in enumerate(sorted_players[:10], 1):
-        names = json.loads(player['names']) if isinstance(player['names'], str) else player['names']
+        # Parse once and keep it on the player, later lookups of the same country reuse it
+        if 'names_list' not in player:
+            player['names_list'] = json.loads(player['names']) if isinstance(player['names'], str) else player['names']
+        names = player['names_list']
         name_str = names[0] if names else "Unknown"
         print(f"{i:2}. {name_str:<25} OpScore: {player['opscore']:8.2f} FeedScore: {player['feedscore']:8.2f}")
 
@@ -1,37 +1,49 @@
 import json
 import sqlite3
 import os
+from sqlite_chunks import select_in_chunks
+
+try:
+    import orjson
+except ImportError:  # optional speed-up (see Dockerfile): reading clusters and names, writing the output
+    orjson = None
+
+def latest_stored_name(names_value):
+    try:
+        stored_names = orjson.loads(names_value) if orjson is not None else json.loads(names_value)
+    except (json.JSONDecodeError, TypeError):
+        return "unknown"
+    if isinstance(stored_names, list) and len(stored_names) > 0:
+        return stored_names[-1]
+    if isinstance(stored_names, str):
+        return stored_names
+    return "unknown"
+
+def fetch_latest_names(cursor, puuids):
+    query = "SELECT puuid, names FROM players WHERE puuid IN ({placeholders})"
+    return {
+        puuid: latest_stored_name(names_value)
+        for puuid, names_value in select_in_chunks(cursor, query, puuids)
+    }
 
 def fetch_cluster_names_with_puuids(cluster_json_path, db_path, output_path):
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-    with open(cluster_json_path, 'r', encoding='utf-8') as f:
-        clusters_data = json.load(f)
+    with open(cluster_json_path, 'rb') as f:
+        raw = f.read()
+    clusters_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
 
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
+    all_members = list({puuid for cluster in clusters_data["clusters"] for puuid in cluster["members"]})
+    latest_names = fetch_latest_names(cursor, all_members)
+
     result = {"clusters": []}
 
     for cluster in clusters_data["clusters"]:
         members = cluster["members"]
-        names = []
-        for puuid in members:
-            cursor.execute("SELECT names FROM players WHERE puuid = ?", (puuid,))
-            row = cursor.fetchone()
-            if row:
-                try:
-                    stored_names = json.loads(row[0])
-                    if isinstance(stored_names, list) and len(stored_names) > 0:
-                        names.append(stored_names[-1])
-                    elif isinstance(stored_names, str):
-                        names.append(stored_names)
-                    else:
-                        names.append("unknown")
-                except json.JSONDecodeError:
-                    names.append("unknown")
-            else:
-                names.append("unknown")
+        names = [latest_names.get(puuid, "unknown") for puuid in members]
 
         result["clusters"].append({
             "members": members,
@@ -41,8 +53,12 @@ def fetch_cluster_names_with_puuids(cluster_json_path, db_path, output_path):
 
     conn.close()
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
 
 # Run
 fetch_cluster_names_with_puuids(
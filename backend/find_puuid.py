@@ -1,25 +1,57 @@
 import os
 import json
-import glob
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-def find_matches_with_puuid(directory, target_puuid):
-    matches_found = []
-    json_files = glob.glob(os.path.join(directory, '**', '*.json'), recursive=True)
+def iter_json_files(directory):
+    """Yield every .json file under directory, skipping hidden entries as glob does."""
+    try:
+        entries = os.scandir(directory)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir():
+                yield from iter_json_files(entry.path)
+            elif entry.name.endswith('.json'):
+                yield entry.path
+
+def scan_match_file(filepath, target_puuid):
+    """Return (filepath, found, match_id, error) for one match file."""
+    try:
+        with open(filepath, 'rb') as f:
+            blob = f.read()
+
+            # Most files do not mention the puuid at all; only parse the ones that do
+            if target_puuid.encode('utf-8') not in blob:
+                return filepath, False, None, None
+            data = json.loads(blob)
 
-    for filepath in json_files:
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            participants = data.get('metadata', {}).get('participants', [])
+            match_id = data.get('metadata', {}).get('matchId', 'Unknown ID')
 
-                participants = data.get('metadata', {}).get('participants', [])
-                match_id = data.get('metadata', {}).get('matchId', 'Unknown ID')
+            if target_puuid in participants:
+                return filepath, True, match_id, None
 
-                if target_puuid in participants:
-                    print(f"[FOUND] Match ID: {match_id} | File: {filepath}")
-                    matches_found.append((match_id, filepath))
+    except Exception as e:
+        return filepath, False, None, e
+    return filepath, False, None, None
+
+def find_matches_with_puuid(directory, target_puuid):
+    matches_found = []
+    # Files are independent, so read and parse them in parallel; scanning starts while
+    # the directory walk is still submitting paths, and results keep walk order
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        results = executor.map(partial(scan_match_file, target_puuid=target_puuid), iter_json_files(directory))
 
-        except Exception as e:
-            print(f"[ERROR] Failed to process {filepath}: {e}")
+        for filepath, found, match_id, error in results:
+            if error is not None:
+                print(f"[ERROR] Failed to process {filepath}: {error}")
+            elif found:
+                print(f"[FOUND] Match ID: {match_id} | File: {filepath}")
+                matches_found.append((match_id, filepath))
 
     print(f"\nDone. Found {len(matches_found)} matches containing PUUID: {target_puuid}")
     return matches_found
@@ -7,6 +7,7 @@ import sqlite3
 import sys
 import time
 from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import requests
@@ -192,6 +193,8 @@ class MatchCollector:
         )
 
         self.processed_players = set()
+        self.candidate_pool = []
+        self.excluded_candidate_puuids = set()
         self.queued_players = set()
         self.invalid_puuids = set()
         self.rank_cache = {}
@@ -222,6 +225,7 @@ class MatchCollector:
         os.makedirs(os.path.dirname(self.raw_db_path), exist_ok=True)
         os.makedirs(self.matches_dir, exist_ok=True)
         os.makedirs(self.cache_dir, exist_ok=True)
+        self.db = self.connect_db()
         self.initialize_raw_database()
         self.log(f"Riot API key mode: {len(self.api_keys)} key(s): {', '.join(self.key_rotator.describe())}.")
 
@@ -263,7 +267,7 @@ class MatchCollector:
         return normalized
 
     def initialize_raw_database(self):
-        with self.connect_db() as connection:
+        with self.db as connection:
             connection.execute(
                 """
                 CREATE TABLE IF NOT EXISTS players (
@@ -452,12 +456,20 @@ class MatchCollector:
     def connect_db(self):
         connection = sqlite3.connect(self.raw_db_path)
         connection.row_factory = sqlite3.Row
+        connection.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA cache_size=-32000;
+            PRAGMA temp_store=MEMORY;
+            """
+        )
         return connection
 
     def upsert_player_stub(self, puuid, name="Unknown Player"):
         if not puuid:
             return
-        with self.connect_db() as conn:
+        with self.db as conn:
             row = conn.execute("SELECT names, match_count FROM players WHERE puuid = ?", (puuid,)).fetchone()
             if row:
                 names = self.merge_names(row["names"], name)
@@ -484,46 +496,46 @@ class MatchCollector:
             names.append(next_name)
         return names[-8:]
 
+    def refill_candidate_pool(self):
+        # Processed and quarantined players only ever accumulate, so only the ones
+        # added since the last refill need to go into the temp table
+        new_exclusions = (self.processed_players | self.invalid_puuids) - self.excluded_candidate_puuids
+        with self.db as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS excluded_candidates (puuid TEXT PRIMARY KEY)")
+            conn.executemany(
+                "INSERT INTO excluded_candidates (puuid) VALUES (?)",
+                ((puuid,) for puuid in new_exclusions),
+            )
+            rows = conn.execute(
+                """
+                SELECT puuid, names
+                FROM players
+                WHERE puuid IS NOT NULL
+                  AND puuid != ''
+                  AND NOT EXISTS (
+                      SELECT 1 FROM excluded_candidates WHERE excluded_candidates.puuid = players.puuid
+                  )
+                ORDER BY RANDOM()
+                LIMIT ?
+                """,
+                (max(self.max_players * 2, 50),),
+            ).fetchall()
+        self.excluded_candidate_puuids |= new_exclusions
+        self.candidate_pool = [(row["puuid"], row["names"]) for row in rows]
+        return bool(self.candidate_pool)
+
     def get_candidate_player(self):
         if self.mode == "specific-puuid":
             return self.get_specific_player_info(self.specific_puuid)
 
-        with self.connect_db() as conn:
-            cursor = conn.cursor()
-            if self.processed_players:
-                placeholders = ",".join(["?"] * len(self.processed_players))
-                cursor.execute(
-                    f"""
-                    SELECT puuid, names
-                    FROM players
-                    WHERE puuid IS NOT NULL
-                      AND puuid != ''
-                      AND puuid NOT IN ({placeholders})
-                    ORDER BY RANDOM()
-                    LIMIT 50
-                    """,
-                    list(self.processed_players),
-                )
-            else:
-                cursor.execute(
-                    """
-                    SELECT puuid, names
-                    FROM players
-                    WHERE puuid IS NOT NULL
-                      AND puuid != ''
-                    ORDER BY RANDOM()
-                    LIMIT 50
-                    """
-                )
-
-            candidates = cursor.fetchall()
-            if not candidates:
-                return None, None
-            choice = self.random.choice(candidates)
-            return choice["puuid"], self.get_latest_name(choice["names"])
+        while self.candidate_pool or self.refill_candidate_pool():
+            puuid, names = self.candidate_pool.pop()
+            if puuid not in self.processed_players and puuid not in self.invalid_puuids:
+                return puuid, self.get_latest_name(names)
+        return None, None
 
     def get_specific_player_info(self, puuid):
-        with self.connect_db() as conn:
+        with self.db as conn:
             row = conn.execute("SELECT puuid, names FROM players WHERE puuid = ?", (puuid,)).fetchone()
             if row:
                 return row["puuid"], self.get_latest_name(row["names"])
@@ -557,31 +569,51 @@ class MatchCollector:
         time.sleep(1.0 / self.requests_per_second)
 
     def make_api_request(self, url, params=None):
-        if self.check_stop_requested():
+        key = self.reserve_api_key()
+        if key is None:
             return None, None
+        response = self.send_api_request(url, params, key)
+        self.record_api_call()
+        return response, key
+
+    def reserve_api_key(self):
+        """Pick and pace the key for the next request, or None once a stop is requested."""
+        if self.check_stop_requested():
+            return None
         key = self.key_rotator.get_next_key()
         self.key_rotator.wait_if_needed(key)
-        response = self.session.get(
+        return key
+
+    def send_api_request(self, url, params, key):
+        # Only the HTTP round trip; touches no collector state, so the match prefetch
+        # worker can run it while the main thread saves
+        return self.session.get(
             url,
             params=params,
             headers={"X-Riot-Token": key["value"]},
             timeout=20,
         )
+
+    def record_api_call(self):
         self.total_api_calls += 1
         self.emit_progress()
-        return response, key
 
     def get_json(self, url, params=None, retry_429=True):
-        response, key = self.make_api_request(url, params)
-        if response is None:
-            return None
+        while True:
+            response, key = self.make_api_request(url, params)
+            if response is None:
+                return None
+            if response.status_code == 429 and retry_429:
+                self.key_rotator.mark_rate_limited(key, response.headers.get("Retry-After") or 30)
+                retry_429 = False
+                continue
+            return self.read_json_response(response, url, params)
+
+    def read_json_response(self, response, url, params=None):
         if response.status_code == 200:
             return response.json()
         if response.status_code == 404:
             return None
-        if response.status_code == 429 and retry_429:
-            self.key_rotator.mark_rate_limited(key, response.headers.get("Retry-After") or 30)
-            return self.get_json(url, params, retry_429=False)
         detail = (response.text or "").strip()
         if len(detail) > 500:
             detail = detail[:500] + "..."
@@ -611,10 +643,12 @@ class MatchCollector:
         return payload if isinstance(payload, list) else []
 
     def fetch_match_data(self, match_id):
-        url = f"https://{self.regional_routing}.api.riotgames.com/lol/match/v5/matches/{match_id}"
         self.current_match_id = match_id
         self.emit_progress()
-        return self.get_json(url)
+        return self.get_json(self.match_url(match_id))
+
+    def match_url(self, match_id):
+        return f"https://{self.regional_routing}.api.riotgames.com/lol/match/v5/matches/{match_id}"
 
     def fetch_summoner_by_id(self, encrypted_summoner_id):
         if not encrypted_summoner_id:
@@ -850,6 +884,52 @@ class MatchCollector:
                 candidates.append(participant)
         return candidates
 
+    def iter_match_data(self, match_ids, prefetched_matches):
+        # A single worker sends the next match request while the caller saves the current
+        # one. The worker only runs send_api_request; the stop and maxMatches checks, key
+        # pacing, call counting, progress events and error handling (including PUUID
+        # quarantine) all happen here on the caller's thread.
+        def start_fetch(match_id):
+            if self.total_matches_saved >= self.max_matches:
+                return None
+            key = self.reserve_api_key()
+            if key is None:
+                return None
+            url = self.match_url(match_id)
+            return url, key, executor.submit(self.send_api_request, url, None, key)
+
+        def finish_fetch(started):
+            if started is None:
+                return None
+            url, key, future = started
+            response = future.result()
+            self.record_api_call()
+            if response.status_code == 429:
+                # Same single retry as get_json, made directly
+                self.key_rotator.mark_rate_limited(key, response.headers.get("Retry-After") or 30)
+                return self.get_json(url, retry_429=False)
+            return self.read_json_response(response, url)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = None
+            for index, match_id in enumerate(match_ids):
+                match_data = prefetched_matches.get(match_id)
+                if match_data is None:
+                    self.current_match_id = match_id
+                    self.emit_progress()
+                    match_data = finish_fetch(pending if pending is not None else start_fetch(match_id))
+                pending = None
+
+                # Saving this match may reach maxMatches; then the next fetch waits for the save
+                next_id = match_ids[index + 1] if index + 1 < len(match_ids) else None
+                if (
+                    next_id is not None
+                    and prefetched_matches.get(next_id) is None
+                    and self.total_matches_saved + 1 < self.max_matches
+                ):
+                    pending = start_fetch(next_id)
+                yield match_id, match_data
+
     def process_player(self, puuid, names, prefetched_matches=None, match_count=None):
         self.current_stage = "collecting-player"
         self.current_player_puuid = puuid
@@ -868,13 +948,10 @@ class MatchCollector:
         saved_for_player = 0
         processed_matches = []
 
-        for match_id in match_ids:
+        for match_id, match_data in self.iter_match_data(match_ids, prefetched_matches):
             if self.check_stop_requested() or self.total_matches_saved >= self.max_matches:
                 break
 
-            match_data = prefetched_matches.get(match_id)
-            if match_data is None:
-                match_data = self.fetch_match_data(match_id)
             if not match_data:
                 continue
             self.total_matches_seen += 1
@@ -1021,10 +1098,13 @@ class MatchCollector:
         if self.mode == "specific-puuid" and not self.specific_puuid:
             raise ValueError("specific-puuid mode requires specificPuuid.")
 
-        if self.collector_mode in {"seed-expansion", "soloq-radial"}:
-            self.run_queue_expansion()
-        else:
-            self.run_legacy_selection()
+        try:
+            if self.collector_mode in {"seed-expansion", "soloq-radial"}:
+                self.run_queue_expansion()
+            else:
+                self.run_legacy_selection()
+        finally:
+            self.db.close()
 
         self.current_stage = "stopped" if self.stop_requested else "completed"
         final_status = "stopped" if self.stop_requested else "completed"
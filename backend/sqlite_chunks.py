@@ -0,0 +1,14 @@
+from typing import Iterator, Sequence
+
+SQL_PARAM_CHUNK = 900  # stay under SQLite's default host-parameter limit
+
+
+def select_in_chunks(cursor, query: str, values: Sequence) -> Iterator[tuple]:
+    """
+    Run `query` over `values` in chunks small enough for one statement each and
+    yield every row. The query marks its IN list as `IN ({placeholders})`.
+    """
+    for i in range(0, len(values), SQL_PARAM_CHUNK):
+        chunk = values[i:i + SQL_PARAM_CHUNK]
+        cursor.execute(query.format(placeholders=",".join("?" * len(chunk))), chunk)
+        yield from cursor.fetchall()